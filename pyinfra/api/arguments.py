@@ -21,7 +21,7 @@ from typing_extensions import TypedDict
 from pyinfra import context
 from pyinfra.api.exceptions import ArgumentTypeError
 from pyinfra.api.state import State
-from pyinfra.api.util import raise_if_bad_type
+from pyinfra.api.util import memoize, raise_if_bad_type
 
 if TYPE_CHECKING:
     from pyinfra.api.config import Config
@@ -229,6 +229,7 @@ class AllArguments(ConnectorArguments, MetaArguments, ExecutionArguments):
     pass
 
 
+@memoize
 def all_global_arguments() -> List[tuple[str, Type]]:
     """Return all global arguments and their types."""
     return list(get_type_hints(AllArguments).items())
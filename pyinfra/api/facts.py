@@ -11,39 +11,57 @@ other host B while I operate on this host A).
 from __future__ import annotations
 
 import inspect
+import logging
 import re
-from inspect import getcallargs
+from os import path
 from socket import error as socket_error, timeout as timeout_error
 from typing import TYPE_CHECKING, Any, Callable, Generic, Iterable, Optional, Type, TypeVar, cast
 
 import click
 import gevent
+from gevent.event import AsyncResult
 from paramiko import SSHException
 
 from pyinfra import logger
 from pyinfra.api import StringCommand
-from pyinfra.api.arguments import all_global_arguments, pop_global_arguments
+from pyinfra.api.arguments import (
+    AllArguments,
+    all_argument_meta,
+    all_global_arguments,
+    pop_global_arguments,
+)
 from pyinfra.api.util import (
     get_kwargs_str,
     log_error_or_warning,
     log_host_command_error,
+    make_cache_key,
     print_host_combined_output,
 )
-from pyinfra.connectors.util import CommandOutput
+from pyinfra.connectors.util import CommandOutput, OutputLine
 from pyinfra.context import ctx_host, ctx_state
 from pyinfra.progress import progress_spinner
 
 from .arguments import CONNECTOR_ARGUMENT_KEYS
+from .exceptions import PyinfraError
 
 if TYPE_CHECKING:
     from pyinfra.api.host import Host
     from pyinfra.api.state import State
 
-SUDO_REGEX = r"^sudo: unknown user"
-SU_REGEXES = (
-    r"^su: user .+ does not exist",
-    r"^su: unknown login",
-)
+# Set of connector argument keys to intersect with when filtering fact arguments
+CONNECTOR_ARGUMENT_KEY_SET = frozenset(CONNECTOR_ARGUMENT_KEYS)
+# Set of all global argument keys, checked against every fact class's command arguments
+GLOBAL_ARGUMENT_KEY_SET = frozenset(name for name, _ in all_global_arguments())
+
+SUDO_REGEX = re.compile(r"^sudo: unknown user")
+SU_REGEX = re.compile(r"^su: (user .+ does not exist|unknown login)")
+
+# Marks the end of each fact's output when multiple facts share a single command
+FACT_SEPARATOR = "__pyinfra_fact_separator__"
+# Maximum number of facts combined into a single command
+FACT_BATCH_SIZE = 20
+# Shells known to support the subshell/echo syntax used to combine fact commands
+FACT_BATCH_SHELLS = frozenset(("sh", "bash", "dash", "ash", "ksh", "zsh"))
 
 
 T = TypeVar("T")
@@ -58,6 +76,12 @@ class FactBase(Generic[T]):
 
     command: Callable[..., str | StringCommand]
 
+    # Signature of `command` (without `self`) used to bind fact arguments
+    _command_signature: inspect.Signature
+
+    # Whether the fact overrides `requires_command` (most don't)
+    _has_requires_command: bool = False
+
     def requires_command(self, *args, **kwargs) -> str | None:
         return None
 
@@ -65,18 +89,23 @@ class FactBase(Generic[T]):
         super().__init_subclass__()
         module_name = cls.__module__.replace("pyinfra.facts.", "")
         cls.name = f"{module_name}.{cls.__name__}"
+        cls._has_requires_command = cls.requires_command is not FactBase.requires_command
 
         # Check that fact's `command` method does not inadvertently take a global
         # argument, most commonly `name`.
         if hasattr(cls, "command") and callable(cls.command):
-            command_args = set(inspect.signature(cls.command).parameters.keys())
-            global_args = set([name for name, _ in all_global_arguments()])
-            command_global_args = command_args & global_args
+            command_signature = inspect.signature(cls.command)
+            command_global_args = command_signature.parameters.keys() & GLOBAL_ARGUMENT_KEY_SET
 
             if len(command_global_args) > 0:
                 names = ", ".join(command_global_args)
                 raise TypeError(f"{cls.name}'s arguments {names} are reserved for global arguments")
 
+            # Cache the signature once per class as binding arguments happens for every fact
+            cls._command_signature = command_signature.replace(
+                parameters=list(command_signature.parameters.values())[1:],
+            )
+
     @staticmethod
     def default() -> T:
         """
@@ -87,9 +116,14 @@ class FactBase(Generic[T]):
 
     def process(self, output: Iterable[str]) -> T:
         # NOTE: TypeVar does not support a default, so we have to cast this str -> T
+        if isinstance(output, list) and len(output) == 1:
+            return cast(T, output[0])
         return cast(T, "\n".join(output))
 
     def process_pipeline(self, args, output):
+        # The default process of a single line is the line itself, so skip wrapping each
+        if type(self).process is FactBase.process:
+            return dict(zip(args, output))
         return {arg: self.process([output[i]]) for i, arg in enumerate(args)}
 
 
@@ -97,33 +131,46 @@ class ShortFactBase(Generic[T]):
     name: str
     fact: Type[FactBase]
 
+    # Short facts only process data, so a single instance per class is shared
+    _instance: "ShortFactBase"
+
     def __init_subclass__(cls) -> None:
         super().__init_subclass__()
         module_name = cls.__module__.replace("pyinfra.facts.", "")
         cls.name = f"{module_name}.{cls.__name__}"
+        cls._instance = cls()
 
     def process_data(self, data):
         return data
 
 
-def get_short_facts(state: "State", host: "Host", short_fact, **kwargs):
-    fact_data = get_fact(state, host, short_fact.fact, **kwargs)
-    return short_fact().process_data(fact_data)
+def get_short_facts(state: "State", host: "Host", short_fact: type[ShortFactBase], **kwargs) -> Any:
+    # Short facts always wrap a regular fact, so load it directly rather than via get_fact
+    fact_data = _get_fact(state, host, short_fact.fact, **kwargs)
+    return short_fact._instance.process_data(fact_data)
 
 
-def _make_command(command_attribute, host_args):
+def _make_command(command_attribute: Any, host_args: dict[str, Any]) -> Any:
     if callable(command_attribute):
         host_args.pop("self", None)
         return command_attribute(**host_args)
     return command_attribute
 
 
-def _handle_fact_kwargs(state, host, cls, args, kwargs):
-    args = args or []
-    kwargs = kwargs or {}
+def _get_fact_global_kwargs(state: "State", host: "Host", kwargs: dict[str, Any]) -> AllArguments:
+    op_global_arguments = host.current_op_global_arguments
+
+    # Within an operation and without any overrides every fact resolves the same global
+    # arguments, so these are cached until the host's current operation changes.
+    use_cache = op_global_arguments is not None and all_argument_meta.keys().isdisjoint(kwargs)
+
+    if use_cache:
+        cached = host.current_op_fact_global_arguments
+        if cached and cached[0] is op_global_arguments:
+            return cast(AllArguments, cached[1].copy())
 
     # Start with a (shallow) copy of current operation kwargs if any
-    ctx_kwargs = (host.current_op_global_arguments or {}).copy()
+    ctx_kwargs: dict[str, Any] = dict(op_global_arguments or {})
     # Update with the input kwargs (overrides)
     ctx_kwargs.update(kwargs)
 
@@ -134,23 +181,46 @@ def _handle_fact_kwargs(state, host, cls, args, kwargs):
         host=host,
     )
 
+    if use_cache and op_global_arguments is not None:
+        host.current_op_fact_global_arguments = (
+            op_global_arguments,
+            cast(AllArguments, global_kwargs.copy()),
+        )
+
+    return global_kwargs
+
+
+def _handle_fact_kwargs(
+    state: "State",
+    host: "Host",
+    cls: type[FactBase],
+    args: Optional[Iterable[Any]],
+    kwargs: Optional[dict[str, Any]],
+) -> tuple[dict[str, Any], AllArguments]:
+    args = args or []
+    kwargs = kwargs or {}
+
+    global_kwargs = _get_fact_global_kwargs(state, host, kwargs)
+
     fact_kwargs = {key: value for key, value in kwargs.items() if key not in global_kwargs}
 
     if args or fact_kwargs:
         # Merges args & kwargs into a single kwargs dictionary
-        fact_kwargs = getcallargs(cls().command, *args, **fact_kwargs)
+        bound_arguments = cls._command_signature.bind(*args, **fact_kwargs)
+        bound_arguments.apply_defaults()
+        fact_kwargs = dict(bound_arguments.arguments)
 
     return fact_kwargs, global_kwargs
 
 
-def get_facts(state: "State", *args, **kwargs):
+def get_facts(state: "State", *args, **kwargs) -> dict["Host", Any]:
     def get_fact_with_context(state, host, *args, **kwargs):
         with ctx_state.use(state):
             with ctx_host.use(host):
                 return get_fact(state, host, *args, **kwargs)
 
     greenlet_to_host = {
-        state.pool.spawn(get_fact_with_context, state, host, *args, **kwargs): host
+        state.fact_pool.spawn(get_fact_with_context, state, host, *args, **kwargs): host
         for host in state.inventory.iter_active_hosts()
     }
 
@@ -165,6 +235,227 @@ def get_facts(state: "State", *args, **kwargs):
     return results
 
 
+def get_facts_bulk(
+    state: "State",
+    host: "Host",
+    fact_specs: Iterable[tuple[type[FactBase], Optional[Any], Optional[Any]]],
+    apply_failed_hosts: bool = True,
+    raise_exceptions: bool = True,
+) -> list[Any]:
+    """
+    Load multiple facts from a single host, returning a list of fact data in the
+    same order as the ``(cls, args, kwargs)`` fact specs provided.
+
+    Facts sharing the same connector arguments are executed together in a single
+    remote shell command (up to ``FACT_BATCH_SIZE`` facts each), saving a round trip
+    to the host per fact. Facts with a ``_timeout``, reading ``_stdin``, using their own
+    shell, a pty or a non POSIX ``_shell_executable`` are always executed on their own.
+
+    With ``raise_exceptions=False`` any ``PyinfraError`` preparing a fact (eg invalid
+    global arguments) is returned in place of that fact's data rather than raised.
+    """
+
+    fact_specs = list(fact_specs)
+    results: list[Any] = [None] * len(fact_specs)
+
+    # List of (executor_kwargs, [(index, short_fact, kwargs, prepared_fact)], can_batch) groups,
+    # a list rather than a dict because executor kwargs contain unhashable values.
+    groups: list[tuple[dict[str, Any], list[tuple], bool]] = []
+
+    for i, (cls, args, kwargs) in enumerate(fact_specs):
+        short_fact = None
+        if issubclass(cls, ShortFactBase):
+            short_fact = cls._instance
+            cls = cls.fact
+
+        try:
+            prepared_fact = _prepare_fact(state, host, cls, args, kwargs)
+        except PyinfraError as e:
+            if raise_exceptions:
+                raise
+            results[i] = e
+            continue
+
+        fact, _, _, executor_kwargs, _ = prepared_fact
+
+        # Facts that read stdin or use their own shell cannot share a command, a timeout
+        # would apply to the combined command rather than the fact itself and a pty merges
+        # stderr into stdout, breaking the separators.
+        can_batch = not (
+            fact.shell_executable
+            or executor_kwargs.get("_stdin")
+            or executor_kwargs.get("_timeout")
+            or executor_kwargs.get("_get_pty")
+            or path.basename(executor_kwargs.get("_shell_executable") or "")
+            not in FACT_BATCH_SHELLS
+        )
+
+        for group_executor_kwargs, group, group_can_batch in groups:
+            if (
+                can_batch
+                and group_can_batch
+                and len(group) < FACT_BATCH_SIZE
+                and group_executor_kwargs == executor_kwargs
+            ):
+                group.append((i, short_fact, kwargs, prepared_fact))
+                break
+        else:
+            groups.append((executor_kwargs, [(i, short_fact, kwargs, prepared_fact)], can_batch))
+
+    if groups and not host.connected:
+        host.connect(
+            reason="to load facts",
+            raise_exceptions=True,
+        )
+
+    for executor_kwargs, group, _ in groups:
+        commands = [prepared_fact[4] for _, _, _, prepared_fact in group]
+
+        fact_outputs: list[tuple[bool, CommandOutput]]
+
+        if len(group) == 1:
+            fact_outputs = [_run_fact_command(state, host, commands[0], executor_kwargs)]
+        else:
+            success_exit_codes = executor_kwargs.get("_success_exit_codes") or [0]
+            status, output = _run_fact_command(
+                state,
+                host,
+                _make_bulk_command(commands),
+                executor_kwargs,
+            )
+
+            # No separators means the combined command never ran (eg missing sudo user), so
+            # every fact gets the whole output and status to handle as if run on its own.
+            if not any(FACT_SEPARATOR in line.line for line in output):
+                fact_outputs = [(status, output)] * len(group)
+            else:
+                fact_outputs = [
+                    (exit_code is not None and exit_code in success_exit_codes, fact_output)
+                    for exit_code, fact_output in _split_bulk_output(output, len(group))
+                ]
+
+        for (i, short_fact, kwargs, prepared_fact), (status, output) in zip(group, fact_outputs):
+            fact, fact_kwargs, global_kwargs, executor_kwargs, _ = prepared_fact
+            data = _handle_fact_output(
+                state,
+                host,
+                fact,
+                kwargs,
+                fact_kwargs,
+                global_kwargs,
+                executor_kwargs,
+                status,
+                output,
+                apply_failed_hosts,
+            )
+            results[i] = short_fact.process_data(data) if short_fact else data
+
+    return results
+
+
+def get_facts_bulk_for_hosts(
+    state: "State",
+    fact_specs: Iterable[tuple[type[FactBase], Optional[Any], Optional[Any]]],
+    apply_failed_hosts: bool = True,
+    raise_exceptions: bool = True,
+) -> dict["Host", list[Any]]:
+    """
+    Load multiple facts from every active host, see ``get_facts_bulk``. With
+    ``raise_exceptions=False`` hosts that fail with a ``PyinfraError`` are left out.
+    """
+
+    fact_specs = list(fact_specs)
+
+    def get_facts_bulk_with_context(state, host):
+        with ctx_state.use(state):
+            with ctx_host.use(host):
+                return get_facts_bulk(
+                    state,
+                    host,
+                    fact_specs,
+                    apply_failed_hosts,
+                    raise_exceptions,
+                )
+
+    greenlet_to_host = {
+        state.fact_pool.spawn(get_facts_bulk_with_context, state, host): host
+        for host in state.inventory.iter_active_hosts()
+    }
+
+    results = {}
+
+    with progress_spinner(greenlet_to_host.values()) as progress:
+        for greenlet in gevent.iwait(greenlet_to_host.keys()):
+            host = greenlet_to_host[greenlet]
+            try:
+                results[host] = greenlet.get()
+            except PyinfraError:
+                if raise_exceptions:
+                    raise
+            progress(host)
+
+    return results
+
+
+def _make_bulk_command(commands: list) -> StringCommand:
+    # The whole batch is grouped so any `cd`/`export` prefix (_chdir/_env) guards every fact
+    bits: list[Any] = ["("]
+
+    for command in commands:
+        # Each fact runs in a subshell so it cannot exit/cd/etc the combined command,
+        # followed by a separator line on both buffers (with the exit code on stdout).
+        # The subshell is closed on a new line in case the command ends with a comment.
+        bits.extend(
+            (
+                "(",
+                command,
+                "\n)",
+                ";",
+                "echo",
+                f"{FACT_SEPARATOR}$?",
+                ";",
+                "echo",
+                FACT_SEPARATOR,
+                ">&2",
+                ";",
+            ),
+        )
+
+    bits.append(")")
+
+    return StringCommand(*bits)
+
+
+def _split_bulk_output(
+    output: CommandOutput,
+    count: int,
+) -> list[tuple[Optional[int], CommandOutput]]:
+    exit_codes: list[Optional[int]] = [None] * count
+    fact_lines: list[list[OutputLine]] = [[] for _ in range(count)]
+    buffer_indexes = {"stdout": 0, "stderr": 0}
+
+    for line in output:
+        index = buffer_indexes[line.buffer_name]
+        if index >= count:
+            continue
+
+        head, separator, tail = line.line.partition(FACT_SEPARATOR)
+        if not separator:
+            fact_lines[index].append(line)
+            continue
+
+        # Output not ending with a newline will be on the same line as the separator
+        if head:
+            fact_lines[index].append(OutputLine(line.buffer_name, head))
+
+        if line.buffer_name == "stdout" and tail.isdigit():
+            exit_codes[index] = int(tail)
+
+        buffer_indexes[line.buffer_name] += 1
+
+    return [(exit_codes[i], CommandOutput(fact_lines[i])) for i in range(count)]
+
+
 def get_fact(
     state: "State",
     host: "Host",
@@ -196,6 +487,44 @@ def get_fact(
     )
 
 
+def _prepare_fact(
+    state: "State",
+    host: "Host",
+    cls: type[FactBase],
+    args: Optional[Iterable[Any]] = None,
+    kwargs: Optional[dict[str, Any]] = None,
+) -> tuple[FactBase, dict[str, Any], AllArguments, dict[str, Any], Any]:
+    fact = cls()
+
+    fact_kwargs, global_kwargs = _handle_fact_kwargs(state, host, cls, args, kwargs)
+
+    # Facts can override the shell (winrm powershell vs cmd support)
+    if fact.shell_executable:
+        global_kwargs["_shell_executable"] = fact.shell_executable
+
+    command = _make_command(fact.command, fact_kwargs)
+    if fact._has_requires_command:
+        requires_command = _make_command(fact.requires_command, fact_kwargs)
+        if requires_command:
+            command = StringCommand(
+                # Command doesn't exist, return 0 *or* run & return fact command
+                "!",
+                "command",
+                "-v",
+                requires_command,
+                ">/dev/null",
+                "||",
+                command,
+            )
+
+    executor_kwargs: dict[str, Any] = {
+        key: global_kwargs[key]  # type: ignore[literal-required]
+        for key in global_kwargs.keys() & CONNECTOR_ARGUMENT_KEY_SET
+    }
+
+    return fact, fact_kwargs, global_kwargs, executor_kwargs, command
+
+
 def _get_fact(
     state: "State",
     host: "Host",
@@ -205,50 +534,79 @@ def _get_fact(
     ensure_hosts: Optional[Any] = None,
     apply_failed_hosts: bool = True,
 ) -> Any:
-    fact = cls()
+    fact, fact_kwargs, global_kwargs, executor_kwargs, command = _prepare_fact(
+        state,
+        host,
+        cls,
+        args,
+        kwargs,
+    )
     name = fact.name
 
-    fact_kwargs, global_kwargs = _handle_fact_kwargs(state, host, cls, args, kwargs)
-
-    kwargs_str = get_kwargs_str(fact_kwargs)
-    logger.debug(
-        "Getting fact: %s (%s) (ensure_hosts: %r)",
-        name,
-        kwargs_str,
-        ensure_hosts,
-    )
+    # Only format the fact arguments when they're actually going to be output
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "Getting fact: %s (%s) (ensure_hosts: %r)",
+            name,
+            get_kwargs_str(fact_kwargs),
+            ensure_hosts,
+        )
 
     if not host.connected:
         host.connect(
-            reason=f"to load fact: {name} ({kwargs_str})",
+            reason=f"to load fact: {name} ({get_kwargs_str(fact_kwargs)})",
             raise_exceptions=True,
         )
 
-    # Facts can override the shell (winrm powershell vs cmd support)
-    if fact.shell_executable:
-        global_kwargs["_shell_executable"] = fact.shell_executable
+    status, output = _run_fact_command(state, host, command, executor_kwargs)
+
+    return _handle_fact_output(
+        state,
+        host,
+        fact,
+        kwargs,
+        fact_kwargs,
+        global_kwargs,
+        executor_kwargs,
+        status,
+        output,
+        apply_failed_hosts,
+    )
 
-    command = _make_command(fact.command, fact_kwargs)
-    requires_command = _make_command(fact.requires_command, fact_kwargs)
-    if requires_command:
-        command = StringCommand(
-            # Command doesn't exist, return 0 *or* run & return fact command
-            "!",
-            "command",
-            "-v",
-            requires_command,
-            ">/dev/null",
-            "||",
-            command,
-        )
+
+def _run_fact_command(
+    state: "State",
+    host: "Host",
+    command,
+    executor_kwargs: dict[str, Any],
+) -> tuple[bool, CommandOutput]:
+    """
+    Run a fact command on the host. If an identical command is already running on the host
+    (ie the same fact requested concurrently) wait for and share its output instead.
+    """
+
+    result = None
+    command_key = None
+
+    # Commands reading stdin cannot be shared as the input is consumed once
+    if not executor_kwargs.get("_stdin"):
+        raw_command = command.get_raw_value() if isinstance(command, StringCommand) else command
+        command_key = make_cache_key((raw_command, executor_kwargs))
+
+        while True:
+            in_flight_result = host.in_flight_fact_commands.get(command_key)
+            if in_flight_result is None:
+                break
+            in_flight_output = in_flight_result.get()
+            # None means the running command was interrupted, so run (or wait) again
+            if in_flight_output is not None:
+                return in_flight_output
+
+        result = host.in_flight_fact_commands[command_key] = AsyncResult()
 
     status = False
     output = CommandOutput([])
 
-    executor_kwargs = {
-        key: value for key, value in global_kwargs.items() if key in CONNECTOR_ARGUMENT_KEYS
-    }
-
     try:
         status, output = host.run_shell_command(
             command,
@@ -260,52 +618,88 @@ def _get_fact(
         log_host_command_error(
             host,
             e,
-            timeout=global_kwargs.get("_timeout"),
+            timeout=executor_kwargs.get("_timeout"),
         )
-
-    stdout_lines, stderr_lines = output.stdout_lines, output.stderr_lines
+    except Exception as e:
+        if result is not None:
+            result.set_exception(e)
+        raise
+    except BaseException:
+        # Interrupted (eg greenlet killed) - never leave waiters blocked
+        if result is not None:
+            result.set(None)
+        raise
+    finally:
+        if command_key is not None:
+            host.in_flight_fact_commands.pop(command_key, None)
+
+    if result is not None:
+        result.set((status, output))
+
+    return status, output
+
+
+def _handle_fact_output(
+    state: "State",
+    host: "Host",
+    fact: FactBase,
+    kwargs: Optional[dict],
+    fact_kwargs: dict,
+    global_kwargs,
+    executor_kwargs: dict,
+    status: bool,
+    output: CommandOutput,
+    apply_failed_hosts: bool,
+) -> Any:
+    name = fact.name
 
     data = fact.default()
 
     if status:
+        stdout_lines = output.stdout_lines
         if stdout_lines:
             data = fact.process(stdout_lines)
-    elif stderr_lines:
+    else:
+        # Only the first line of any error output is needed, so avoid building the list
+        first_line = next((line.line for line in output if line.buffer_name == "stderr"), "")
+
         # If we have error output and that error is sudo or su stating the user
         # does not exist, do not fail but instead return the default fact value.
         # This allows for users that don't currently but may be created during
         # other operations.
-        first_line = stderr_lines[0]
-        if executor_kwargs["_sudo_user"] and re.match(SUDO_REGEX, first_line):
+        if executor_kwargs["_sudo_user"] and SUDO_REGEX.match(first_line):
             status = True
-        if executor_kwargs["_su_user"] and any(re.match(regex, first_line) for regex in SU_REGEXES):
+        if executor_kwargs["_su_user"] and SU_REGEX.match(first_line):
             status = True
 
     if status:
-        log_message = "{0}{1}".format(
-            host.print_prefix,
-            "Loaded fact {0}{1}".format(
-                click.style(name, bold=True),
-                f" ({get_kwargs_str(kwargs)})" if kwargs else "",
-            ),
-        )
-        if state.print_fact_info:
-            logger.info(log_message)
-        else:
-            logger.debug(log_message)
+        if state.print_fact_info or logger.isEnabledFor(logging.DEBUG):
+            log_message = "{0}{1}".format(
+                host.print_prefix,
+                "Loaded fact {0}{1}".format(
+                    click.style(name, bold=True),
+                    f" ({get_kwargs_str(kwargs)})" if kwargs else "",
+                ),
+            )
+            if state.print_fact_info:
+                logger.info(log_message)
+            else:
+                logger.debug(log_message)
     else:
+        ignore_errors = global_kwargs["_ignore_errors"]
+
         if not state.print_fact_output:
             print_host_combined_output(host, output)
 
         log_error_or_warning(
             host,
-            global_kwargs["_ignore_errors"],
+            ignore_errors,
             description=("could not load fact: {0} {1}").format(name, get_kwargs_str(fact_kwargs)),
         )
 
-    # Check we've not failed
-    if apply_failed_hosts and not status and not global_kwargs["_ignore_errors"]:
-        state.fail_hosts({host})
+        # Check we've not failed
+        if apply_failed_hosts and not ignore_errors:
+            state.fail_hosts({host})
 
     return data
 
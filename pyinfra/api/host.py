@@ -17,6 +17,7 @@ from typing import (
 from uuid import uuid4
 
 import click
+from gevent.event import AsyncResult
 from typing_extensions import Unpack
 
 from pyinfra import logger
@@ -114,6 +115,9 @@ class Host:
     in_callback_op: bool = False
     current_op_hash: Optional[str] = None
     current_op_global_arguments: Optional["AllArguments"] = None
+    # Global arguments resolved for facts in the current operation, as a tuple of
+    # (current_op_global_arguments, fact_global_arguments).
+    current_op_fact_global_arguments: Optional[tuple["AllArguments", "AllArguments"]] = None
 
     # Current context inside a @deploy function which become part of the op data
     in_deploy: bool = False
@@ -158,6 +162,10 @@ class Host:
 
         self.connector_data = {}
 
+        # Results of fact commands currently being executed on this host, keyed by the
+        # command & connector arguments, shared with identical concurrent fact requests.
+        self.in_flight_fact_commands: dict[Any, AsyncResult] = {}
+
         # Append only list of operation hashes as called on this host, used to
         # generate a DAG to create the final operation order.
         self.op_hash_order: list[str] = []
@@ -287,6 +287,7 @@ def _wrap_operation(func: Callable[P, Generator], _set_in_op: bool = True) -> Py
                 host.in_op = False
                 host.current_op_hash = None
                 host.current_op_global_arguments = None
+                host.current_op_fact_global_arguments = None
                 host.current_op_deploy_data = None
 
         op_is_change = None
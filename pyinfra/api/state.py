@@ -149,6 +149,9 @@ class State:
 
     # Main gevent pool
     pool: "Pool"
+    # Pool for loading facts, bounded separately so fact loading started from within
+    # greenlets in the main pool cannot wait on the main pool itself.
+    fact_pool: "Pool"
 
     # Current stage this state is in
     current_stage: StateStage = StateStage.Setup
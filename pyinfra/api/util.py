@@ -63,15 +63,44 @@ def try_int(value):
         return value
 
 
+def make_cache_key(obj):
+    """
+    Make a hashable key from an arbitrary nested dictionary, list, tuple or set, used
+    as a dictionary key directly rather than serializing the object into a string.
+    """
+
+    if isinstance(obj, dict):
+        return (dict, tuple((key, make_cache_key(value)) for key, value in obj.items()))
+
+    if isinstance(obj, (list, tuple)):
+        return (type(obj), tuple(make_cache_key(e) for e in obj))
+
+    if isinstance(obj, (set, frozenset)):
+        return (type(obj), frozenset(make_cache_key(e) for e in obj))
+
+    if obj is None or isinstance(obj, (str, bytes)):
+        return obj
+
+    # Include the type so that 1 and True are different keys
+    if isinstance(obj, (int, float)):
+        return (type(obj), obj)
+
+    # Other objects are keyed by their string representation, matching `make_hash`
+    return (type(obj), "{0}".format(obj))
+
+
+_memoize_miss = object()
+
+
 def memoize(func: Callable[..., Any]):
     @wraps(func)
     def wrapper(*args, **kwargs):
-        key = "{0}{1}".format(args, kwargs)
-        if key in wrapper.cache:  # type: ignore[attr-defined]
-            return wrapper.cache[key]  # type: ignore[attr-defined]
+        key = make_cache_key((args, kwargs)) if kwargs else make_cache_key(args)
 
-        value = func(*args, **kwargs)
-        wrapper.cache[key] = value  # type: ignore[attr-defined]
+        cache = wrapper.cache  # type: ignore[attr-defined]
+        value = cache.get(key, _memoize_miss)
+        if value is _memoize_miss:
+            value = cache[key] = func(*args, **kwargs)
         return value
 
     wrapper.cache = {}  # type: ignore[attr-defined]
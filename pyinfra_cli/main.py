@@ -11,7 +11,7 @@ from pyinfra import __version__, logger, state
 from pyinfra.api import Config, State
 from pyinfra.api.connect import connect_all, disconnect_all
 from pyinfra.api.exceptions import NoGroupError, PyinfraError
-from pyinfra.api.facts import get_facts
+from pyinfra.api.facts import get_facts_bulk_for_hosts
 from pyinfra.api.operations import run_ops
 from pyinfra.api.state import StateStage
 from pyinfra.api.util import get_kwargs_str
@@ -676,9 +676,12 @@ def _run_fact_operations(state, config, operations):
     logger.info("--> Gathering facts...")
 
     state.print_fact_info = True
-    fact_data = {}
+    fact_data: dict[str, dict] = {}
 
-    for i, command in enumerate(operations):
+    fact_keys = []
+    fact_specs = []
+
+    for command in operations:
         fact_cls, args, kwargs = command
         fact_key = fact_cls.name
 
@@ -687,16 +690,23 @@ def _run_fact_operations(state, config, operations):
             _fact_details = " ({0})".format(get_kwargs_str(kwargs)) if kwargs else ""
             fact_key = "{0}{1}{2}".format(fact_cls.name, _fact_args, _fact_details)
 
-        try:
-            fact_data[fact_key] = get_facts(
-                state,
-                fact_cls,
-                args=args,
-                kwargs=kwargs,
-                apply_failed_hosts=False,
-            )
-        except PyinfraError:
-            pass
+        fact_keys.append(fact_key)
+        fact_specs.append((fact_cls, args, kwargs))
+
+    # Load all the facts for each host at once, which batches them into a single command
+    host_fact_data = get_facts_bulk_for_hosts(
+        state,
+        fact_specs,
+        apply_failed_hosts=False,
+        raise_exceptions=False,
+    )
+
+    for host, data in host_fact_data.items():
+        for fact_key, fact_value in zip(fact_keys, data):
+            # Facts that could not be loaded (eg invalid arguments) are skipped
+            if isinstance(fact_value, PyinfraError):
+                continue
+            fact_data.setdefault(fact_key, {})[host] = fact_value
 
     return state, fact_data
 
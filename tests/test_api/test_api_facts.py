@@ -1,12 +1,24 @@
+from unittest import TestCase
 from unittest.mock import MagicMock, patch
 
+import gevent
+
 from pyinfra.api import Config, State
 from pyinfra.api.arguments import CONNECTOR_ARGUMENT_KEYS, pop_global_arguments
 from pyinfra.api.connect import connect_all
-from pyinfra.api.exceptions import PyinfraError
-from pyinfra.api.facts import get_facts
-from pyinfra.connectors.util import CommandOutput, OutputLine
-from pyinfra.facts.server import Arch, Command
+from pyinfra.api.exceptions import ArgumentTypeError, PyinfraError
+from pyinfra.api.facts import (
+    FACT_BATCH_SIZE,
+    FACT_SEPARATOR,
+    FactBase,
+    get_fact,
+    get_facts,
+    get_facts_bulk,
+    get_facts_bulk_for_hosts,
+)
+from pyinfra.connectors.util import CommandOutput, OutputLine, make_unix_command
+from pyinfra.facts.cargo import CargoPackages
+from pyinfra.facts.server import Arch, Command, HasGui, LinuxGui
 
 from ..paramiko_util import PatchSSHTestCase
 from ..util import make_inventory
@@ -21,6 +33,29 @@ def _get_executor_defaults(state, host):
     }
 
 
+class TestFactBase(TestCase):
+    def test_process(self):
+        assert Command().process(["some-output"]) == "some-output"
+        assert Command().process(["some", "output"]) == "some\noutput"
+        assert Command().process(iter(["some", "output"])) == "some\noutput"
+
+    def test_command_global_argument_reserved(self):
+        with self.assertRaises(TypeError) as context:
+
+            class BadFact(FactBase):
+                def command(self, name, _sudo):
+                    return ""
+
+        assert context.exception.args[0].startswith("tests.test_api.test_api_facts.BadFact's")
+        assert "reserved for global arguments" in context.exception.args[0]
+
+    def test_process_pipeline(self):
+        assert Command().process_pipeline(["a", "b"], ["1", "2"]) == {"a": "1", "b": "2"}
+        assert CargoPackages().process_pipeline(["a"], ["foo v1.0.0:"]) == {
+            "a": {"foo": {"1.0.0"}},
+        }
+
+
 class TestFactsApi(PatchSSHTestCase):
     def test_get_fact(self):
         inventory = make_inventory(hosts=("anotherhost",))
@@ -78,6 +113,36 @@ class TestFactsApi(PatchSSHTestCase):
             **defaults,
         )
 
+    def test_get_fact_current_op_global_arguments_cached(self):
+        inventory = make_inventory(hosts=("anotherhost",))
+        state = State(inventory, Config())
+
+        anotherhost = inventory.get_host("anotherhost")
+
+        connect_all(state)
+        anotherhost.current_op_global_arguments = {"_sudo": True}
+
+        with patch("pyinfra.connectors.ssh.SSHConnector.run_shell_command") as fake_run_command:
+            fake_run_command.return_value = True, CommandOutput(
+                [OutputLine("stdout", "some-output")]
+            )
+            with patch(
+                "pyinfra.api.facts.pop_global_arguments",
+                wraps=pop_global_arguments,
+            ) as fake_pop_global_arguments:
+                get_facts(state, Command, ("yes",))
+                get_facts(state, Command, ("yes",))
+                assert fake_pop_global_arguments.call_count == 1
+
+                # Override global arguments are never cached
+                get_facts(state, Command, ("yes",), {"_sudo": False})
+                assert fake_pop_global_arguments.call_count == 2
+
+                # Changing operation invalidates the cache
+                anotherhost.current_op_global_arguments = {"_sudo": True}
+                get_facts(state, Command, ("yes",))
+                assert fake_pop_global_arguments.call_count == 3
+
     def test_get_fact_error(self):
         inventory = make_inventory(hosts=("anotherhost",))
         state = State(inventory, Config())
@@ -101,6 +166,26 @@ class TestFactsApi(PatchSSHTestCase):
             **_get_executor_defaults(state, anotherhost),
         )
 
+    def test_get_fact_error_sudo_user_missing(self):
+        inventory = make_inventory(hosts=("anotherhost",))
+        state = State(inventory, Config())
+
+        anotherhost = inventory.get_host("anotherhost")
+
+        connect_all(state)
+
+        for kwargs, error in (
+            ({"_sudo": True, "_sudo_user": "someuser"}, "sudo: unknown user: someuser"),
+            ({"_su_user": "someuser"}, "su: user someuser does not exist"),
+            ({"_su_user": "someuser"}, "su: unknown login: someuser"),
+        ):
+            with patch("pyinfra.connectors.ssh.SSHConnector.run_shell_command") as fake_run_command:
+                fake_run_command.return_value = False, CommandOutput([OutputLine("stderr", error)])
+                fact_data = get_facts(state, Command, ("yes",), kwargs)
+
+            assert fact_data == {anotherhost: None}
+            assert anotherhost not in state.failed_hosts
+
     def test_get_fact_error_ignore(self):
         inventory = make_inventory(hosts=("anotherhost",))
         state = State(inventory, Config())
@@ -242,6 +327,306 @@ class TestFactsApi(PatchSSHTestCase):
             **defaults,
         )
 
+    def test_get_fact_concurrent_shared(self):
+        inventory = make_inventory(hosts=("anotherhost",))
+        state = State(inventory, Config())
+
+        anotherhost = inventory.get_host("anotherhost")
+
+        connect_all(state)
+
+        def fake_run_shell_command(*args, **kwargs):
+            gevent.sleep(0.01)
+            return True, CommandOutput([OutputLine("stdout", "some-output")])
+
+        with patch(
+            "pyinfra.connectors.ssh.SSHConnector.run_shell_command",
+            side_effect=fake_run_shell_command,
+        ) as fake_run_command:
+            greenlets = [
+                gevent.spawn(get_fact, state, anotherhost, Command, ("yes",)) for _ in range(3)
+            ]
+            gevent.joinall(greenlets, raise_error=True)
+
+        assert [greenlet.value for greenlet in greenlets] == ["some-output"] * 3
+        assert fake_run_command.call_count == 1
+        assert anotherhost.in_flight_fact_commands == {}
+
+    def test_get_fact_concurrent_shared_killed(self):
+        inventory = make_inventory(hosts=("anotherhost",))
+        state = State(inventory, Config())
+
+        anotherhost = inventory.get_host("anotherhost")
+
+        connect_all(state)
+
+        def fake_run_shell_command(*args, **kwargs):
+            gevent.sleep(0.01)
+            return True, CommandOutput([OutputLine("stdout", "some-output")])
+
+        with patch(
+            "pyinfra.connectors.ssh.SSHConnector.run_shell_command",
+            side_effect=fake_run_shell_command,
+        ) as fake_run_command:
+            greenlets = [
+                gevent.spawn(get_fact, state, anotherhost, Command, ("yes",)) for _ in range(3)
+            ]
+            gevent.sleep(0)
+            greenlets[0].kill()
+            gevent.joinall(greenlets[1:], timeout=1, raise_error=True)
+
+        assert [greenlet.value for greenlet in greenlets[1:]] == ["some-output"] * 2
+        assert fake_run_command.call_count == 2
+        assert anotherhost.in_flight_fact_commands == {}
+
+    def test_get_fact_requires_command(self):
+        inventory = make_inventory(hosts=("host-1",))
+        state = State(inventory, Config())
+
+        connect_all(state)
+
+        assert CargoPackages._has_requires_command is True
+        assert Arch._has_requires_command is False
+
+        with patch("pyinfra.connectors.ssh.SSHConnector.run_shell_command") as fake_run_command:
+            fake_run_command.return_value = True, CommandOutput([])
+            get_facts(state, CargoPackages)
+
+        command = fake_run_command.call_args[0][0]
+        assert command.get_raw_value() == "! command -v cargo >/dev/null || {0}".format(
+            CargoPackages().command(),
+        )
+
+    def test_get_short_fact(self):
+        inventory = make_inventory(hosts=("anotherhost",))
+        state = State(inventory, Config())
+
+        anotherhost = inventory.get_host("anotherhost")
+
+        connect_all(state)
+
+        with patch("pyinfra.connectors.ssh.SSHConnector.run_shell_command") as fake_run_command:
+            fake_run_command.return_value = True, CommandOutput(
+                [OutputLine("stdout", "/usr/bin/gnome-session")]
+            )
+            fact_data = get_facts(state, HasGui)
+
+        assert fact_data == {anotherhost: True}
+
+        fake_run_command.assert_called_with(
+            LinuxGui().command(),
+            print_input=False,
+            print_output=False,
+            **_get_executor_defaults(state, anotherhost),
+        )
+
+
+class TestFactsBulkApi(PatchSSHTestCase):
+    def test_get_facts_bulk(self):
+        inventory = make_inventory(hosts=("host-1",))
+        state = State(inventory, Config())
+
+        connect_all(state)
+
+        host_1 = inventory.get_host("host-1")
+
+        with patch("pyinfra.connectors.ssh.SSHConnector.run_shell_command") as fake_run_command:
+            fake_run_command.return_value = True, CommandOutput(
+                [
+                    OutputLine("stdout", "first-output"),
+                    OutputLine("stdout", f"{FACT_SEPARATOR}0"),
+                    OutputLine("stderr", FACT_SEPARATOR),
+                    OutputLine("stdout", f"second-output{FACT_SEPARATOR}0"),
+                    OutputLine("stderr", FACT_SEPARATOR),
+                ],
+            )
+            fact_data = get_facts_bulk(
+                state,
+                host_1,
+                [(Command, ("echo first # comment",), None), (Arch, None, None)],
+            )
+
+        assert fact_data == ["first-output", "second-output"]
+        assert fake_run_command.call_count == 1
+
+        command = fake_run_command.call_args[0][0]
+        # Closed on a new line so a trailing comment cannot comment out the subshell
+        assert "( echo first # comment \n)" in command.get_raw_value()
+        assert "( {0} \n)".format(Arch().command()) in command.get_raw_value()
+
+    def test_get_facts_bulk_chdir(self):
+        inventory = make_inventory(hosts=("host-1",))
+        state = State(inventory, Config())
+
+        connect_all(state)
+
+        host_1 = inventory.get_host("host-1")
+        kwargs = {"_chdir": "/some-dir"}
+
+        with patch("pyinfra.connectors.ssh.SSHConnector.run_shell_command") as fake_run_command:
+            fake_run_command.return_value = True, CommandOutput([])
+            get_facts_bulk(
+                state,
+                host_1,
+                [(Command, ("echo first",), kwargs), (Command, ("echo second",), kwargs)],
+            )
+
+        assert fake_run_command.call_count == 1
+        assert fake_run_command.call_args[1]["_chdir"] == "/some-dir"
+
+        # The chdir prefix must guard the whole batch, not just the first fact
+        command = make_unix_command(
+            fake_run_command.call_args[0][0],
+            _chdir="/some-dir",
+            _shell_executable=None,
+        ).get_raw_value()
+        assert command.startswith("cd /some-dir && ( ( echo first")
+        assert command.endswith(" )")
+        assert command.count("cd /some-dir") == 1
+
+    def test_get_facts_bulk_error(self):
+        inventory = make_inventory(hosts=("host-1",))
+        state = State(inventory, Config())
+
+        connect_all(state)
+
+        host_1 = inventory.get_host("host-1")
+        host_1.current_op_global_arguments = {
+            "_ignore_errors": True,
+        }
+
+        with patch("pyinfra.connectors.ssh.SSHConnector.run_shell_command") as fake_run_command:
+            fake_run_command.return_value = True, CommandOutput(
+                [
+                    OutputLine("stdout", f"{FACT_SEPARATOR}1"),
+                    OutputLine("stderr", "some-error"),
+                    OutputLine("stderr", FACT_SEPARATOR),
+                    OutputLine("stdout", "second-output"),
+                    OutputLine("stdout", f"{FACT_SEPARATOR}0"),
+                    OutputLine("stderr", FACT_SEPARATOR),
+                ],
+            )
+            fact_data = get_facts_bulk(
+                state,
+                host_1,
+                [(Command, ("fail command",), None), (Command, ("echo second",), None)],
+            )
+
+        assert fact_data == [None, "second-output"]
+
+    def test_get_facts_bulk_for_hosts(self):
+        inventory = make_inventory(hosts=("host-1", "host-2"))
+        state = State(inventory, Config())
+
+        connect_all(state)
+
+        with patch("pyinfra.connectors.ssh.SSHConnector.run_shell_command") as fake_run_command:
+            fake_run_command.return_value = True, CommandOutput(
+                [
+                    OutputLine("stdout", "first-output"),
+                    OutputLine("stdout", f"{FACT_SEPARATOR}0"),
+                    OutputLine("stderr", FACT_SEPARATOR),
+                    OutputLine("stdout", "second-output"),
+                    OutputLine("stdout", f"{FACT_SEPARATOR}0"),
+                    OutputLine("stderr", FACT_SEPARATOR),
+                ],
+            )
+            fact_data = get_facts_bulk_for_hosts(
+                state,
+                [(Command, ("echo first",), None), (Arch, None, None)],
+            )
+
+        assert fact_data == {
+            inventory.get_host("host-1"): ["first-output", "second-output"],
+            inventory.get_host("host-2"): ["first-output", "second-output"],
+        }
+        assert fake_run_command.call_count == 2
+
+    def test_get_facts_bulk_invalid_spec(self):
+        inventory = make_inventory(hosts=("host-1", "host-2"))
+        state = State(inventory, Config())
+
+        connect_all(state)
+
+        host_1 = inventory.get_host("host-1")
+        fact_specs = [
+            (Command, ("echo ok",), None),
+            (Command, ("echo x",), {"_timeout": "notint"}),
+        ]
+
+        with patch("pyinfra.connectors.ssh.SSHConnector.run_shell_command") as fake_run_command:
+            fake_run_command.return_value = True, CommandOutput([OutputLine("stdout", "ok")])
+
+            with self.assertRaises(ArgumentTypeError):
+                get_facts_bulk(state, host_1, fact_specs)
+
+            fact_data = get_facts_bulk(state, host_1, fact_specs, raise_exceptions=False)
+            assert fact_data[0] == "ok"
+            assert isinstance(fact_data[1], ArgumentTypeError)
+
+            # The invalid spec must not lose the other facts for any host
+            hosts_fact_data = get_facts_bulk_for_hosts(
+                state,
+                fact_specs,
+                apply_failed_hosts=False,
+                raise_exceptions=False,
+            )
+
+        assert set(hosts_fact_data.keys()) == set(inventory)
+        for host_fact_data in hosts_fact_data.values():
+            assert host_fact_data[0] == "ok"
+            assert isinstance(host_fact_data[1], ArgumentTypeError)
+
+    def test_get_facts_bulk_not_batched(self):
+        inventory = make_inventory(hosts=("host-1",))
+        state = State(inventory, Config())
+
+        connect_all(state)
+
+        host_1 = inventory.get_host("host-1")
+
+        for kwargs, fact_count, call_count in (
+            (None, FACT_BATCH_SIZE + 1, 2),
+            ({"_timeout": 10}, 2, 2),
+            ({"_get_pty": True}, 2, 2),
+            ({"_shell_executable": "/usr/bin/fish"}, 2, 2),
+            ({"_shell_executable": "/bin/bash"}, 2, 1),
+        ):
+            with patch(
+                "pyinfra.connectors.ssh.SSHConnector.run_shell_command",
+            ) as fake_run_command:
+                fake_run_command.return_value = True, CommandOutput([])
+                get_facts_bulk(
+                    state,
+                    host_1,
+                    [(Command, ("echo {0}".format(i),), kwargs) for i in range(fact_count)],
+                )
+
+            assert fake_run_command.call_count == call_count
+
+    def test_get_facts_bulk_error_sudo_user_missing(self):
+        inventory = make_inventory(hosts=("host-1",))
+        state = State(inventory, Config())
+
+        connect_all(state)
+
+        host_1 = inventory.get_host("host-1")
+        kwargs = {"_sudo": True, "_sudo_user": "someuser"}
+
+        with patch("pyinfra.connectors.ssh.SSHConnector.run_shell_command") as fake_run_command:
+            fake_run_command.return_value = False, CommandOutput(
+                [OutputLine("stderr", "sudo: unknown user: someuser")],
+            )
+            fact_data = get_facts_bulk(
+                state,
+                host_1,
+                [(Command, ("echo first",), kwargs), (Arch, None, kwargs)],
+            )
+
+        assert fact_data == [None, None]
+        assert fake_run_command.call_count == 1
+        assert host_1 not in state.failed_hosts
+
 
 class TestHostFactsApi(PatchSSHTestCase):
     def test_get_host_fact(self):
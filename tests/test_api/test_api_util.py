@@ -1,7 +1,14 @@
 from io import BytesIO, StringIO
 from unittest import TestCase
 
-from pyinfra.api.util import format_exception, get_caller_frameinfo, get_file_io, try_int
+from pyinfra.api.util import (
+    format_exception,
+    get_caller_frameinfo,
+    get_file_io,
+    make_cache_key,
+    memoize,
+    try_int,
+)
 
 
 class TestApiUtil(TestCase):
@@ -16,13 +23,35 @@ class TestApiUtil(TestCase):
             return get_caller_frameinfo()
 
         frameinfo = _get_caller_frameinfo()
-        assert frameinfo.lineno == 18  # called by the line above
+        assert frameinfo.lineno == 25  # called by the line above
 
     def test_format_exception(self):
         exception = Exception("I am a message", 1)
         assert format_exception(exception) == "Exception('I am a message', 1)"
 
 
+class TestApiUtilMemoize(TestCase):
+    def test_make_cache_key(self):
+        key = make_cache_key(("a", {"b": [1, 2]}, {3}))
+        assert key == make_cache_key(("a", {"b": [1, 2]}, {3}))
+        assert key != make_cache_key(("a", {"b": (1, 2)}, {3}))
+        assert hash(key) == hash(make_cache_key(("a", {"b": [1, 2]}, {3})))
+
+    def test_memoize(self):
+        calls = []
+
+        @memoize
+        def add(a, b=0):
+            calls.append((a, b))
+            return a + b
+
+        assert add(1, b=2) == 3
+        assert add(1, b=2) == 3
+        assert add([1], b=[2]) == [1, 2]
+        assert add([1], b=[2]) == [1, 2]
+        assert calls == [(1, 2), ([1], [2])]
+
+
 class TestApiUtilFileIO(TestCase):
     def test_get_file_io_stringio_to_string(self):
         file = StringIO("some string")